@@ -41,8 +41,11 @@ def run_step(args: list[str], label: str) -> None:
     print(f"[backend] {label} complete.")
 
 
-def build_and_validate() -> None:
-    run_step([sys.executable, "backend/scripts/model_pipeline.py"], "model pipeline")
+def build_and_validate(incremental: bool = False) -> None:
+    pipeline = [sys.executable, "backend/scripts/model_pipeline.py"]
+    if incremental:
+        pipeline.append("--incremental")
+    run_step(pipeline, "model pipeline")
     run_step([sys.executable, "backend/scripts/validate_model_artifacts.py"], "artifact validation")
 
 
@@ -57,7 +60,7 @@ def main() -> None:
             new_state = current_state()
             if new_state != last_state:
                 print("[backend] Input data change detected. Rebuilding model artifacts.")
-                build_and_validate()
+                build_and_validate(incremental=True)
                 last_state = new_state
     except KeyboardInterrupt:
         print("[backend] Dev runner stopped.")
@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+
+ROOT = Path(__file__).resolve().parents[2]
+BASELINE_PATH = ROOT / "backend" / "data" / "loadtest" / "api_baseline_v1.json"
+
+SHORT_IDEA = "Graph neural networks for wildfire spread forecasting."
+LONG_IDEA = " ".join(
+    [
+        "A multi-institution program combining remote sensing, soil moisture telemetry and",
+        "physics-informed machine learning to forecast wildfire spread at hourly resolution,",
+        "with community partners co-designing evacuation decision tools.",
+    ]
+    * 20
+)
+REQUEST_KINDS: dict[str, tuple[str, str, dict[str, Any] | None]] = {
+    "analyze_short": ("POST", "/api/analyze-idea", {"idea": SHORT_IDEA}),
+    "analyze_long": ("POST", "/api/analyze-idea", {"idea": LONG_IDEA}),
+    "metrics": ("GET", "/api/metrics", None),
+}
+DEFAULT_MIX = "analyze_short=6,analyze_long=3,metrics=1"
+PERCENTILES = (50, 95, 99)
+# Settings that change what throughput and tail latency mean; a baseline only gates runs that match all of them.
+BASELINE_CONFIG_KEYS = ("concurrency", "requests", "duration_s", "warmup", "mix")
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    mix: dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in REQUEST_KINDS:
+            raise ValueError(f"Unknown request kind in mix: {name!r} (expected one of {sorted(REQUEST_KINDS)})")
+        try:
+            value = float(weight or 1)
+        except ValueError:
+            raise ValueError(f"Mix weight for {name!r} is not a number: {weight!r}") from None
+        if not value >= 0 or value == float("inf"):
+            raise ValueError(f"Mix weight for {name!r} must be a finite non-negative number: {weight!r}")
+        mix[name] = value
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError(f"Request mix has no positive weights: {spec!r}")
+    return mix
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    lo = int(rank)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo)
+
+
+def _summarize(samples: list[tuple[str, float, bool]], elapsed_s: float) -> dict[str, Any]:
+    latencies = [lat * 1000.0 for _, lat, _ in samples]
+    errors = sum(1 for _, _, ok in samples if not ok)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "throughput_rps": len(samples) / elapsed_s if elapsed_s > 0 else 0.0,
+        "latency_ms": {f"p{p}": _percentile(latencies, p) for p in PERCENTILES},
+    }
+
+
+class _Worker:
+    """One keep-alive connection per worker thread, like a browser tab hammering the API."""
+
+    def __init__(self, base_url: str, timeout_s: float) -> None:
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 80
+        self.timeout_s = timeout_s
+        self.conn: http.client.HTTPConnection | None = None
+
+    def send(self, kind: str) -> tuple[str, float, bool]:
+        method, path, payload = REQUEST_KINDS[kind]
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        started = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout_s)
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            response.read()
+            ok = 200 <= response.status < 300
+        except (OSError, http.client.HTTPException):
+            ok = False
+            self.close()
+        return kind, time.perf_counter() - started, ok
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def run_load(
+    base_url: str,
+    concurrency: int,
+    total_requests: int,
+    mix: dict[str, float],
+    duration_s: float | None = None,
+    warmup: int = 0,
+    timeout_s: float = 10.0,
+    seed: int = 0,
+) -> dict[str, Any]:
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+    rng = random.Random(seed)
+    # With a duration the request count is open-ended; otherwise stop after warmup + total_requests.
+    limit = None if duration_s is not None else warmup + total_requests
+
+    lock = threading.Lock()
+    issued = 0
+    samples: list[tuple[str, float, bool]] = []
+    measure_start: float | None = None
+
+    def _take() -> tuple[int, str] | None:
+        nonlocal issued, measure_start
+        with lock:
+            now = time.perf_counter()
+            if issued == warmup:
+                measure_start = now
+            if limit is not None and issued >= limit:
+                return None
+            if duration_s is not None and measure_start is not None and now - measure_start >= duration_s:
+                return None
+            issued += 1
+            return issued - 1, rng.choices(kinds, weights=weights)[0]
+
+    def _loop() -> None:
+        worker = _Worker(base_url, timeout_s)
+        try:
+            while (item := _take()) is not None:
+                i, kind = item
+                result = worker.send(kind)
+                if i >= warmup:
+                    with lock:
+                        samples.append(result)
+        finally:
+            worker.close()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(_loop) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - measure_start if measure_start is not None else 0.0
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "config": run_config(concurrency, total_requests, mix, duration_s, warmup),
+        "overall": _summarize(samples, elapsed),
+        "by_kind": {
+            kind: _summarize([s for s in samples if s[0] == kind], elapsed)
+            for kind in kinds
+        },
+    }
+    return report
+
+
+def run_config(
+    concurrency: int,
+    total_requests: int,
+    mix: dict[str, float],
+    duration_s: float | None,
+    warmup: int,
+) -> dict[str, Any]:
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests if duration_s is None else None,
+        "duration_s": duration_s,
+        "warmup": warmup,
+        "mix": mix,
+    }
+
+
+def baseline_mismatch(baseline: dict[str, Any], config: dict[str, Any]) -> str | None:
+    recorded = baseline.get("config", {})
+    diffs = [
+        f"{key}: baseline={recorded.get(key)!r} run={config[key]!r}"
+        for key in BASELINE_CONFIG_KEYS
+        if recorded.get(key) != config[key]
+    ]
+    if diffs:
+        return (
+            "Baseline was recorded with different settings (" + "; ".join(diffs) + "). "
+            "Use the baseline's settings, or pass --baseline <path> --save-baseline to record one for these."
+        )
+    return None
+
+
+def compare_to_baseline(report: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    regressions: list[str] = []
+    sections = [("overall", report["overall"], baseline.get("overall", {}))]
+    sections += [
+        (kind, stats, baseline.get("by_kind", {}).get(kind, {}))
+        for kind, stats in report["by_kind"].items()
+    ]
+    for name, stats, previous in sections:
+        if not previous:
+            continue
+        if stats["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {stats['throughput_rps']:.1f} rps < baseline {previous['throughput_rps']:.1f} rps"
+            )
+        if stats["error_rate"] > previous["error_rate"]:
+            regressions.append(f"{name}: error rate {stats['error_rate']:.2%} > baseline {previous['error_rate']:.2%}")
+        for key, value in stats["latency_ms"].items():
+            before = previous.get("latency_ms", {}).get(key)
+            if value is not None and before is not None and value > before * (1 + tolerance):
+                regressions.append(f"{name}: {key} {value:.2f} ms > baseline {before:.2f} ms")
+    return regressions
+
+
+def _port_in_use(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(1)
+        return sock.connect_ex(("127.0.0.1", port)) == 0
+
+
+def _start_server(port: int) -> subprocess.Popen:
+    # Otherwise the readiness probe could be answered by whatever already owns the port.
+    if _port_in_use(port):
+        raise RuntimeError(f"Port {port} is already in use; stop that process or drop --start-server to test it.")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"API server exited with code {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/metrics")
+            conn.getresponse().read()
+            conn.close()
+        except OSError:
+            time.sleep(0.2)
+            continue
+        if proc.poll() is not None:
+            raise RuntimeError(f"API server exited with code {proc.returncode}; another process answered on port {port}")
+        return proc
+    proc.terminate()
+    raise RuntimeError("API server did not become ready within 15s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the local Python API service.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of a running server.")
+    parser.add_argument("--start-server", action="store_true", help="Start server.py with uvicorn on --url's port.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests (after warmup).")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds instead.")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted request kinds, e.g. {DEFAULT_MIX!r}.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression vs baseline.")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline.")
+    parser.add_argument("--report", type=Path, default=None, help="Also write the report JSON here.")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+    baseline = None
+    if not args.save_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        # Check before generating load: a mismatched baseline can't gate this run.
+        config = run_config(args.concurrency, args.requests, mix, args.duration, args.warmup)
+        mismatch = baseline_mismatch(baseline, config)
+        if mismatch:
+            print(mismatch, file=sys.stderr)
+            sys.exit(1)
+
+    server = None
+    if args.start_server:
+        try:
+            server = _start_server(urlparse(args.url).port or 80)
+        except RuntimeError as exc:
+            print(exc, file=sys.stderr)
+            sys.exit(1)
+    try:
+        report = run_load(
+            args.url,
+            concurrency=args.concurrency,
+            total_requests=args.requests,
+            mix=mix,
+            duration_s=args.duration,
+            warmup=args.warmup,
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(json.dumps(report, indent=2))
+    if args.report is not None:
+        args.report.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Baseline saved: {args.baseline}")
+        return
+
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one.")
+        return
+
+    regressions = compare_to_baseline(report, baseline, args.tolerance)
+    if regressions:
+        print("Load test regressed against baseline:", file=sys.stderr)
+        for line in regressions:
+            print(f"  {line}", file=sys.stderr)
+        sys.exit(1)
+    print("Load test within baseline tolerance.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import argparse
 import json
+import os
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
@@ -15,6 +17,9 @@ DATA_DIR = ROOT / "backend" / "data"
 INPUTS_DIR = DATA_DIR / "model_inputs" / "v1"
 MODELS_DIR = DATA_DIR / "models" / "v1"
 
+SIMILARITY_TOP_K = 5
+SIMILARITY_BLOCK_ROWS = 1024
+
 
 def _normalize(series: pd.Series) -> pd.Series:
     s = series.astype(float)
@@ -40,9 +45,21 @@ class PipelineMetrics:
     opportunity_score_growth_corr: float | None
     similarity_nodes: int
     similarity_avg_neighbors: float
+    similarity_updated_rows: int
     radar_axes: int
 
 
+@dataclass
+class SimilarityUpdate:
+    mode: str
+    grant_ids: list[str]
+    features: np.ndarray
+    neighbors: np.ndarray
+    changed: list[str]
+    removed: list[str]
+    updated: list[str]
+
+
 def build_inputs() -> dict[str, Any]:
     INPUTS_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -192,7 +209,125 @@ def _build_opportunity_model(field_summary_snapshot: pd.DataFrame) -> tuple[pd.D
     return out, metrics
 
 
-def _build_similarity_model(field_summary_snapshot: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, dict[str, float]]:
+def _top_k_neighbors(X_unit: np.ndarray, rows: np.ndarray, k: int = SIMILARITY_TOP_K) -> np.ndarray:
+    """Exact top-k cosine neighbors for `rows`, one row of indices each, padded with -1."""
+    table = np.full((len(rows), k), -1, dtype=int)
+    m = min(k, X_unit.shape[0] - 1)
+    if m <= 0:
+        return table
+    for start in range(0, len(rows), SIMILARITY_BLOCK_ROWS):
+        block = rows[start : start + SIMILARITY_BLOCK_ROWS]
+        sims = X_unit[block] @ X_unit.T
+        # skip self, keep top-k
+        sims[np.arange(len(block)), block] = -np.inf
+        part = np.argpartition(-sims, m - 1, axis=1)[:, :m]
+        order = np.argsort(-np.take_along_axis(sims, part, axis=1), axis=1)
+        table[start : start + len(block), :m] = np.take_along_axis(part, order, axis=1)
+    return table
+
+
+def _load_previous_similarity() -> dict[str, Any] | None:
+    # Features and neighbor indices come from the same file, so they always describe the same run.
+    state_path = MODELS_DIR / "similarity_features_v1.npz"
+    if not state_path.exists():
+        return None
+
+    with np.load(state_path, allow_pickle=False) as saved:
+        if "neighbors" not in saved.files:
+            return None
+        grant_ids = [str(g) for g in saved["grant_ids"]]
+        features = saved["features"].astype(float)
+        table = saved["neighbors"].astype(int)
+
+    neighbors = {gid: [grant_ids[j] for j in row if j >= 0] for gid, row in zip(grant_ids, table)}
+    return {"grant_ids": grant_ids, "features": features, "neighbors": neighbors}
+
+
+def _update_neighbors_incremental(
+    X: np.ndarray,
+    X_unit: np.ndarray,
+    grant_ids: list[str],
+    previous: dict[str, Any],
+    k: int = SIMILARITY_TOP_K,
+) -> tuple[np.ndarray, SimilarityUpdate] | None:
+    """Patch the previous run's neighbor table instead of recomputing all N x N similarities.
+
+    Changed rows and rows whose stored neighbors changed (or disappeared) get an exact
+    top-k recompute. Every other row keeps its neighbors unless a changed row now beats
+    its current k-th similarity, in which case the changed rows are merged into its list.
+    Returns None when the previous run cannot be reused and a full rebuild is needed.
+    """
+    prev_features = previous["features"]
+    prev_neighbors = previous["neighbors"]
+    if prev_features.ndim != 2 or prev_features.shape[1] != X.shape[1]:
+        return None
+
+    n = len(grant_ids)
+    index = {gid: i for i, gid in enumerate(grant_ids)}
+    prev_index = {gid: i for i, gid in enumerate(previous["grant_ids"])}
+    prev_pos = np.array([prev_index.get(gid, -1) for gid in grant_ids], dtype=int)
+    known = (prev_pos >= 0) & np.array([gid in prev_neighbors for gid in grant_ids], dtype=bool)
+
+    is_changed = np.ones(n, dtype=bool)
+    is_changed[known] = np.any(X[known] != prev_features[prev_pos[known]], axis=1)
+    changed = np.flatnonzero(is_changed)
+    # A shifted min/max in _normalize moves every row; a full rebuild is cheaper then.
+    if len(changed) > n // 2:
+        return None
+    removed = sorted(set(previous["grant_ids"]) - set(index))
+    stale = {grant_ids[i] for i in changed} | set(removed)
+
+    # Carry over stored neighbors; rows pointing at a changed/removed row need a full recompute.
+    table = np.full((n, k), -1, dtype=int)
+    recompute = is_changed.copy()
+    for i in np.flatnonzero(~is_changed):
+        nbrs = prev_neighbors[grant_ids[i]][:k]
+        if any(gid in stale for gid in nbrs):
+            recompute[i] = True
+            continue
+        table[i, : len(nbrs)] = [index[gid] for gid in nbrs]
+
+    # Unaffected rows only change if a changed row beats their current k-th neighbor.
+    merged: list[int] = []
+    candidates = np.flatnonzero(~recompute)
+    if len(changed) and len(candidates):
+        valid = table[candidates] >= 0
+        kth = np.einsum("nd,nkd->nk", X_unit[candidates], X_unit[np.where(valid, table[candidates], 0)])
+        kth = np.where(valid, kth, -np.inf).min(axis=1)
+        best = np.full(len(candidates), -np.inf)
+        for start in range(0, len(changed), SIMILARITY_BLOCK_ROWS):
+            block = changed[start : start + SIMILARITY_BLOCK_ROWS]
+            best = np.maximum(best, (X_unit[block] @ X_unit[candidates].T).max(axis=0))
+        for col in np.flatnonzero(best > kth):
+            i = int(candidates[col])
+            pool = np.concatenate([table[i][table[i] >= 0], changed])
+            order = np.argsort(-(X_unit[pool] @ X_unit[i]))
+            top = pool[order][:k]
+            table[i] = -1
+            table[i, : len(top)] = top
+            merged.append(i)
+
+    rows = np.flatnonzero(recompute)
+    if len(rows):
+        table[rows] = _top_k_neighbors(X_unit, rows, k)
+
+    updated = sorted(set(rows.tolist()) | set(merged))
+    update = SimilarityUpdate(
+        mode="incremental",
+        grant_ids=grant_ids,
+        features=X,
+        neighbors=table,
+        changed=[grant_ids[i] for i in changed],
+        removed=removed,
+        updated=[grant_ids[i] for i in updated],
+    )
+    return table, update
+
+
+def _build_similarity_model(
+    field_summary_snapshot: pd.DataFrame,
+    previous: dict[str, Any] | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame, SimilarityUpdate, dict[str, float]]:
     df = field_summary_snapshot.copy()
     df["FOR4_CODE"] = df["FOR4_CODE"].astype(str).str.strip()
     df["FOR4_NAME"] = df["FOR4_NAME"].astype(str).fillna("").str.strip()
@@ -235,29 +370,41 @@ def _build_similarity_model(field_summary_snapshot: pd.DataFrame) -> tuple[pd.Da
         }
     )
 
+    grant_ids = map_rows["grant_id"].tolist()
     row_norm = np.linalg.norm(X, axis=1, keepdims=True)
     row_norm[row_norm == 0] = 1.0
     X_unit = X / row_norm
-    sim = X_unit @ X_unit.T
+
+    result = _update_neighbors_incremental(X, X_unit, grant_ids, previous) if previous is not None else None
+    if result is None:
+        table = _top_k_neighbors(X_unit, np.arange(len(grant_ids)))
+        # A full rebuild patches nothing: the delta stays empty and the merged table is authoritative.
+        update = SimilarityUpdate("full", grant_ids, X, table, [], [], [])
+    else:
+        table, update = result
+
+    names = map_rows["for4_name"].tolist()
     neighbors_rows: list[dict[str, Any]] = []
-    for i, row in map_rows.iterrows():
-        sims = sim[i]
-        order = np.argsort(-sims)
-        # skip self, keep top-5
-        top = [j for j in order if j != i][:5]
-        for j in top:
+    for i, i_id in enumerate(grant_ids):
+        nbrs = [int(j) for j in table[i] if j >= 0]
+        sims = X_unit[nbrs] @ X_unit[i] if nbrs else np.empty(0)
+        for j, s in zip(nbrs, sims):
             neighbors_rows.append(
                 {
-                    "grant_id": row["grant_id"],
-                    "neighbor_grant_id": map_rows.iloc[j]["grant_id"],
-                    "neighbor_for4_name": map_rows.iloc[j]["for4_name"],
-                    "similarity": float(sims[j]),
+                    "grant_id": i_id,
+                    "neighbor_grant_id": grant_ids[j],
+                    "neighbor_for4_name": names[j],
+                    "similarity": float(s),
                 }
             )
-    neighbors = pd.DataFrame(neighbors_rows)
+    neighbors = pd.DataFrame(neighbors_rows, columns=["grant_id", "neighbor_grant_id", "neighbor_for4_name", "similarity"])
     avg_n = float(neighbors.groupby("grant_id").size().mean()) if not neighbors.empty else 0.0
-    metrics = {"similarity_nodes": int(len(map_rows)), "similarity_avg_neighbors": avg_n}
-    return map_rows, neighbors, metrics
+    metrics = {
+        "similarity_nodes": int(len(map_rows)),
+        "similarity_avg_neighbors": avg_n,
+        "similarity_updated_rows": int(len(update.updated)),
+    }
+    return map_rows, neighbors, update, metrics
 
 
 def _build_radar_competitiveness_model(
@@ -331,21 +478,50 @@ def _build_radar_competitiveness_model(
     return out, metrics
 
 
-def train_and_evaluate() -> PipelineMetrics:
+def _write_similarity_delta(update: SimilarityUpdate, neighbors: pd.DataFrame) -> None:
+    payload = {
+        "version": "v1",
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "mode": update.mode,
+        "nodes": len(update.grant_ids),
+        "changed_grant_ids": update.changed,
+        "removed_grant_ids": update.removed,
+        "updated_grant_ids": update.updated,
+        "neighbors": json.loads(neighbors[neighbors["grant_id"].isin(set(update.updated))].to_json(orient="records")),
+    }
+    (MODELS_DIR / "similarity_neighbors_delta_v1.json").write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    state_path = MODELS_DIR / "similarity_features_v1.npz"
+    tmp_path = state_path.with_suffix(".npz.tmp")
+    with tmp_path.open("wb") as fh:
+        np.savez(
+            fh,
+            grant_ids=np.array(update.grant_ids, dtype=str),
+            features=update.features,
+            neighbors=update.neighbors,
+        )
+    os.replace(tmp_path, state_path)
+
+
+def train_and_evaluate(incremental: bool = False) -> PipelineMetrics:
     MODELS_DIR.mkdir(parents=True, exist_ok=True)
 
     field_summary_snapshot = pd.read_csv(INPUTS_DIR / "field_summary_snapshot.csv")
     forecast_snapshot = pd.read_json(INPUTS_DIR / "forecast_snapshot.json")
+    previous_similarity = _load_previous_similarity() if incremental else None
 
     forecast_out, forecast_metrics = _build_forecast_model(forecast_snapshot)
     opportunity_out, opp_metrics = _build_opportunity_model(field_summary_snapshot)
-    sim_map, sim_neighbors, sim_metrics = _build_similarity_model(field_summary_snapshot)
+    sim_map, sim_neighbors, sim_update, sim_metrics = _build_similarity_model(
+        field_summary_snapshot, previous_similarity
+    )
     radar_out, radar_metrics = _build_radar_competitiveness_model(field_summary_snapshot)
 
     forecast_out.to_json(MODELS_DIR / "forecast_v1.json", orient="records", indent=2)
     opportunity_out.to_json(MODELS_DIR / "opportunity_scores_v1.json", orient="records", indent=2)
     sim_map.to_json(MODELS_DIR / "similarity_map_v1.json", orient="records", indent=2)
     sim_neighbors.to_json(MODELS_DIR / "similarity_neighbors_v1.json", orient="records", indent=2)
+    _write_similarity_delta(sim_update, sim_neighbors)
     radar_out.to_json(MODELS_DIR / "radar_competitiveness_v1.json", orient="records", indent=2)
 
     metrics = PipelineMetrics(
@@ -354,6 +530,7 @@ def train_and_evaluate() -> PipelineMetrics:
         opportunity_score_growth_corr=opp_metrics["opportunity_score_growth_corr"],
         similarity_nodes=sim_metrics["similarity_nodes"],
         similarity_avg_neighbors=sim_metrics["similarity_avg_neighbors"],
+        similarity_updated_rows=sim_metrics["similarity_updated_rows"],
         radar_axes=radar_metrics["radar_axes"],
     )
     return metrics
@@ -377,6 +554,7 @@ def write_meta(manifest: dict[str, Any], metrics: PipelineMetrics) -> None:
             "opportunity_score_growth_corr": metrics.opportunity_score_growth_corr,
             "similarity_nodes": metrics.similarity_nodes,
             "similarity_avg_neighbors": metrics.similarity_avg_neighbors,
+            "similarity_updated_rows": metrics.similarity_updated_rows,
             "radar_axes": metrics.radar_axes,
         },
     }
@@ -384,8 +562,16 @@ def write_meta(manifest: dict[str, Any], metrics: PipelineMetrics) -> None:
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Build v1 model artifacts.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse the previous similarity run and only recompute neighbors for changed rows.",
+    )
+    args = parser.parse_args()
+
     manifest = build_inputs()
-    metrics = train_and_evaluate()
+    metrics = train_and_evaluate(incremental=args.incremental)
     write_meta(manifest, metrics)
     print("Model pipeline complete.")
     print(f"Artifacts: {MODELS_DIR}")
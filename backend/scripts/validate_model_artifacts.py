@@ -38,6 +38,9 @@ def main() -> None:
     sim_map = pd.read_json(MODELS_DIR / "similarity_map_v1.json")
     sim_neighbors = pd.read_json(MODELS_DIR / "similarity_neighbors_v1.json")
     radar = pd.read_json(MODELS_DIR / "radar_competitiveness_v1.json")
+    # The delta is per-machine run state (gitignored), so only check it when a local run produced one.
+    delta_path = MODELS_DIR / "similarity_neighbors_delta_v1.json"
+    sim_delta = json.loads(delta_path.read_text(encoding="utf-8")) if delta_path.exists() else None
 
     _validate_columns(
         "forecast_v1.json",
@@ -59,6 +62,20 @@ def main() -> None:
         sim_neighbors,
         {"grant_id", "neighbor_grant_id", "similarity"},
     )
+    if sim_delta is not None:
+        missing_delta = sorted(
+            {"mode", "changed_grant_ids", "removed_grant_ids", "updated_grant_ids", "neighbors"} - set(sim_delta)
+        )
+        if missing_delta:
+            raise ValueError(f"similarity_neighbors_delta_v1.json missing keys: {missing_delta}")
+        if sim_delta["mode"] not in {"full", "incremental"}:
+            raise ValueError(f"similarity_neighbors_delta_v1.json has unexpected mode: {sim_delta['mode']!r}")
+        if sim_delta["neighbors"]:
+            _validate_columns(
+                "similarity_neighbors_delta_v1.json neighbors",
+                pd.DataFrame(sim_delta["neighbors"]),
+                {"grant_id", "neighbor_grant_id", "similarity"},
+            )
     _validate_columns(
         "radar_competitiveness_v1.json",
         radar,
@@ -80,6 +97,8 @@ def main() -> None:
     print(f"opportunity rows: {len(opportunity)}")
     print(f"similarity nodes: {len(sim_map)}")
     print(f"neighbor links: {len(sim_neighbors)}")
+    if sim_delta is not None:
+        print(f"similarity delta: {sim_delta['mode']}, {len(sim_delta['updated_grant_ids'])} updated rows")
     print(f"radar axes: {len(radar)}")
 
 
@@ -1,6 +1,11 @@
-from fastapi import FastAPI
+import time
+from bisect import bisect_left
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from starlette.routing import Match
 
 app = FastAPI()
 
@@ -13,6 +18,112 @@ app.add_middleware(
 )
 
 
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+LOCAL_HOSTS = {"127.0.0.1", "::1", "::ffff:127.0.0.1"}
+
+
+class RequestMetrics:
+    """Per-route latency histograms, in-flight counts and payload sizes, kept in memory."""
+
+    def __init__(self) -> None:
+        self.started_at = time.time()
+        self.routes: dict[str, dict] = {}
+
+    def _route(self, key: str) -> dict:
+        if key not in self.routes:
+            self.routes[key] = {
+                "in_flight": 0,
+                "count": 0,
+                "errors": 0,
+                "latency_sum_s": 0.0,
+                "latency_buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+                "request_bytes": 0,
+                "response_bytes": 0,
+            }
+        return self.routes[key]
+
+    def start(self, key: str) -> None:
+        self._route(key)["in_flight"] += 1
+
+    def finish(self, key: str, elapsed_s: float, status: int, request_bytes: int, response_bytes: int) -> None:
+        route = self._route(key)
+        route["in_flight"] -= 1
+        route["count"] += 1
+        if status >= 500:
+            route["errors"] += 1
+        route["latency_sum_s"] += elapsed_s
+        route["latency_buckets"][bisect_left(LATENCY_BUCKETS, elapsed_s)] += 1
+        route["request_bytes"] += request_bytes
+        route["response_bytes"] += response_bytes
+
+    def snapshot(self) -> dict:
+        routes = {}
+        for key, route in sorted(self.routes.items()):
+            cumulative = 0
+            buckets = []
+            for bound, hits in zip(LATENCY_BUCKETS + ["+Inf"], route["latency_buckets"]):
+                cumulative += hits
+                buckets.append({"le": bound, "count": cumulative})
+            count = route["count"]
+            routes[key] = {
+                "in_flight": route["in_flight"],
+                "count": count,
+                "errors": route["errors"],
+                "latency_sum_s": route["latency_sum_s"],
+                "latency_avg_s": route["latency_sum_s"] / count if count else None,
+                "latency_buckets": buckets,
+                "request_bytes_total": route["request_bytes"],
+                "response_bytes_total": route["response_bytes"],
+                "request_bytes_avg": route["request_bytes"] / count if count else None,
+                "response_bytes_avg": route["response_bytes"] / count if count else None,
+            }
+        return {"uptime_s": time.time() - self.started_at, "routes": routes}
+
+
+metrics = RequestMetrics()
+
+
+def _route_key(request: Request) -> str:
+    # Use the route template so unknown paths don't explode the number of series
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return f"{request.method} {route.path}"
+    return f"{request.method} unmatched"
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    key = _route_key(request)
+    metrics.start(key)
+    started = time.perf_counter()
+    status = 500
+    response_bytes = 0
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response_bytes = int(response.headers.get("content-length", 0))
+        return response
+    finally:
+        metrics.finish(
+            key,
+            time.perf_counter() - started,
+            status,
+            int(request.headers.get("content-length", 0)),
+            response_bytes,
+        )
+
+
+@app.get("/api/metrics")
+def get_metrics(request: Request):
+    # Local debugging only: don't hand request stats to other machines
+    client_host = request.client.host if request.client else ""
+    if client_host not in LOCAL_HOSTS:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    return metrics.snapshot()
+
+
 # This defines what data Next.js will send you
 class IdeaRequest(BaseModel):
     idea: str